@@ -3,14 +3,20 @@
 Comprehensive test suite for huv (Hierarchical UV) functionality
 """
 
+import importlib.machinery
+import importlib.util
+import json
 import os
 import platform
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
 def get_activate_script(venv_path):
@@ -66,6 +72,16 @@ def get_activate_this_py(venv_path):
         return venv_path / "bin" / "activate_this.py"
 
 
+def load_huv_module():
+    """Import the huv script as a module for testing its helpers directly"""
+    huv_path = Path(__file__).resolve().parent.parent / "huv"
+    loader = importlib.machinery.SourceFileLoader("huv_module", str(huv_path))
+    spec = importlib.util.spec_from_loader("huv_module", loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
 class TestHuv(unittest.TestCase):
     """Test suite for huv functionality"""
 
@@ -80,8 +96,23 @@ class TestHuv(unittest.TestCase):
         self.huv_path = Path(self.original_cwd) / "huv"
         self.assertTrue(self.huv_path.exists(), "huv executable not found")
 
+        # Keep huv's persistent caches and registry inside the test directory
+        self.original_cache_dir = os.environ.get("HUV_CACHE_DIR")
+        self.original_data_dir = os.environ.get("HUV_DATA_DIR")
+        self.cache_dir = self.test_dir / ".huv-cache"
+        os.environ["HUV_CACHE_DIR"] = str(self.cache_dir)
+        os.environ["HUV_DATA_DIR"] = str(self.test_dir / ".huv-data")
+
     def tearDown(self):
         """Clean up test environment"""
+        for name, value in (
+            ("HUV_CACHE_DIR", self.original_cache_dir),
+            ("HUV_DATA_DIR", self.original_data_dir),
+        ):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
         os.chdir(self.original_cwd)
         if self.test_dir.exists():
             shutil.rmtree(self.test_dir)
@@ -261,6 +292,49 @@ class TestHuv(unittest.TestCase):
             self.assertIn("huv_parent =", content)
             self.assertIn("sys.path", content)
 
+    def test_relink_after_parent_moves(self):
+        """Test that relink regenerates the precomputed parent paths"""
+        parent_name = "test_relink_parent"
+        moved_parent_name = "test_relink_parent_moved"
+        child_name = "test_relink_child"
+
+        grandchild_name = "test_relink_grandchild"
+        new_root_name = "test_relink_root"
+
+        self.run_huv(["venv", parent_name])
+        self.run_huv(["venv", child_name, "--parent", parent_name])
+        self.run_huv(["venv", grandchild_name, "--parent", child_name])
+
+        (self.test_dir / parent_name).rename(self.test_dir / moved_parent_name)
+
+        # Without --parent there is nothing valid to relink to
+        result = self.run_huv(["relink", child_name], expect_success=False)
+        self.assertNotEqual(result.returncode, 0)
+
+        self.run_huv(["relink", child_name, "--parent", moved_parent_name])
+
+        child_path = self.test_dir / child_name
+        moved_parent_path = str((self.test_dir / moved_parent_name).resolve())
+        with open(child_path / "pyvenv.cfg") as f:
+            content = f.read()
+            self.assertEqual(content.count("huv_parent ="), 1)
+            self.assertIn(moved_parent_path, content)
+
+        with open(get_virtualenv_py(child_path)) as f:
+            content = f.read()
+            self.assertEqual(content.count("# huv hierarchy support"), 1)
+            self.assertIn(moved_parent_path, content)
+
+        # The grandchild's precomputed paths run through the child, so they
+        # follow when the child is pointed at another parent
+        self.run_huv(["venv", new_root_name])
+        result = self.run_huv(["relink", child_name, "--parent", new_root_name])
+        self.assertIn("Relinked descendant", result.stdout)
+        with open(get_virtualenv_py(self.test_dir / grandchild_name)) as f:
+            content = f.read()
+            self.assertIn(str((self.test_dir / new_root_name).resolve()), content)
+            self.assertNotIn(moved_parent_path, content)
+
     def test_uv_arguments_passthrough(self):
         """Test that uv arguments are properly passed through"""
         venv_name = "test_seed"
@@ -301,6 +375,114 @@ class TestHuv(unittest.TestCase):
             content = f.read()
             self.assertIn("_setup_huv_hierarchy", content)
 
+    def test_venv_argument_cache(self):
+        """Test that parsed uv venv arguments are cached on disk and can be cleared"""
+        self.run_huv(["venv", "test_cache_first"])
+
+        cache_files = list((self.cache_dir / "uv-venv-args").glob("*.json"))
+        self.assertEqual(len(cache_files), 1)
+
+        # A second invocation reuses the cached specification
+        self.run_huv(["venv", "test_cache_second", "--seed"])
+        self.assertTrue(
+            get_pip_executable(self.test_dir / "test_cache_second").exists()
+        )
+
+        result = self.run_huv(["cache", "clear"])
+        self.assertIn("Cleared huv cache", result.stdout)
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_daemon_serves_cached_state(self):
+        """Test that a running daemon answers huv's requests and can be stopped"""
+        if platform.system() == "Windows":
+            self.skipTest("The daemon requires Unix domain sockets")
+
+        result = self.run_huv(["daemon", "status"], expect_success=False)
+        self.assertNotEqual(result.returncode, 0)
+
+        self.run_huv(["daemon", "start"])
+        try:
+            self.run_huv(["venv", "test_daemon_venv"])
+            result = self.run_huv(["daemon", "status"])
+            self.assertIn("huv daemon is running", result.stdout)
+            requests = re.search(r"Requests served: (\d+)", result.stdout)
+            self.assertGreater(int(requests.group(1)), 1)
+        finally:
+            self.run_huv(["daemon", "stop"])
+
+        self.assertFalse((self.cache_dir / "daemon.sock").exists())
+        result = self.run_huv(["daemon", "status"], expect_success=False)
+        self.assertNotEqual(result.returncode, 0)
+
+    def test_child_created_from_template(self):
+        """Test that later children of a parent are cloned from a cached template"""
+        if platform.system() == "Windows":
+            self.skipTest("Templates are disabled on Windows")
+
+        parent_name = "test_template_parent"
+        self.run_huv(["venv", parent_name, "--seed"])
+
+        result = self.run_huv(["venv", "test_template_first", "--parent", parent_name])
+        self.assertNotIn("cached template", result.stdout)
+        self.assertEqual(len(list((self.cache_dir / "templates").iterdir())), 1)
+
+        result = self.run_huv(["venv", "test_template_second", "--parent", parent_name])
+        self.assertIn("Created from cached template", result.stdout)
+
+        first_path = str((self.test_dir / "test_template_first").resolve())
+        second_path = self.test_dir / "test_template_second"
+        with open(second_path / "bin" / "activate") as f:
+            content = f.read()
+            self.assertIn(str(second_path.resolve()), content)
+            self.assertNotIn(first_path, content)
+
+        # The clone is a working child that still sees the parent's packages
+        result = subprocess.run(
+            [
+                str(get_python_executable(second_path)),
+                "-c",
+                "import sys, pip; print(sys.prefix); print(pip.__file__)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        prefix, pip_file = result.stdout.splitlines()
+        self.assertEqual(Path(prefix).resolve(), second_path.resolve())
+        self.assertIn(parent_name, pip_file)
+
+    def test_create_venvs_from_manifest(self):
+        """Test batch creation from a manifest with per-environment failures"""
+        self.run_huv(["venv", "test_manifest_parent"])
+        manifest = self.test_dir / "envs.toml"
+        manifest.write_text(
+            "[defaults]\n"
+            'parent = "test_manifest_parent"\n'
+            "\n"
+            "[[venv]]\n"
+            'path = "test_manifest_child1"\n'
+            "\n"
+            "[[venv]]\n"
+            'path = "test_manifest_child2"\n'
+            "\n"
+            "[[venv]]\n"
+            'path = "test_manifest_orphan"\n'
+            'parent = "nonexistent"\n'
+        )
+
+        result = self.run_huv(
+            ["venv", "--from-manifest", str(manifest)], expect_success=False
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Created 2/3 environment(s)", result.stdout)
+        self.assertIn("does not exist", result.stderr)
+        self.assertFalse((self.test_dir / "test_manifest_orphan").exists())
+
+        parent_path = str((self.test_dir / "test_manifest_parent").resolve())
+        for child_name in ["test_manifest_child1", "test_manifest_child2"]:
+            with open(self.test_dir / child_name / "pyvenv.cfg") as f:
+                self.assertIn(f"huv_parent = {parent_path}", f.read())
+
     def test_multiple_hierarchy_levels(self):
         """Test creating multiple levels of hierarchy"""
         grandparent = "test_grandparent"
@@ -318,6 +500,112 @@ class TestHuv(unittest.TestCase):
             self.assertTrue(env_path.exists())
             self.assertTrue((env_path / "pyvenv.cfg").exists())
 
+        # The child's sys.path includes the whole chain, nearest ancestor first
+        child_python = get_python_executable(self.test_dir / child)
+        result = subprocess.run(
+            [str(child_python), "-c", "import sys; print('\\n'.join(sys.path))"],
+            capture_output=True,
+            text=True,
+        )
+        sys_path = result.stdout.splitlines()
+        parent_idx = next(
+            i for i, p in enumerate(sys_path) if parent in p and "site-packages" in p
+        )
+        grandparent_idx = next(
+            i
+            for i, p in enumerate(sys_path)
+            if grandparent in p and "site-packages" in p
+        )
+        self.assertLess(parent_idx, grandparent_idx)
+
+        # Relinking an ancestor under its own descendant is rejected
+        result = self.run_huv(
+            ["relink", grandparent, "--parent", child], expect_success=False
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("cycle", result.stderr)
+
+    def test_registry_tracks_hierarchy(self):
+        """Test that created environments are registered and scan refreshes them"""
+        root = self.test_dir.resolve()
+        self.run_huv(["venv", "test_reg_root"])
+        self.run_huv(["venv", "test_reg_a", "--parent", "test_reg_root"])
+        self.run_huv(["venv", "test_reg_b", "--parent", "test_reg_root"])
+        self.run_huv(["venv", "test_reg_leaf", "--parent", "test_reg_a"])
+
+        result = self.run_huv(["registry", "children", "test_reg_root"])
+        self.assertEqual(
+            result.stdout.splitlines(),
+            [str(root / "test_reg_a"), str(root / "test_reg_b")],
+        )
+        result = self.run_huv(["registry", "ancestors", "test_reg_leaf"])
+        self.assertEqual(
+            result.stdout.splitlines(),
+            [str(root / "test_reg_a"), str(root / "test_reg_root")],
+        )
+        result = self.run_huv(["registry", "tree"])
+        self.assertEqual(
+            result.stdout.splitlines(),
+            [
+                str(root / "test_reg_root"),
+                "    " + str(root / "test_reg_a"),
+                "        " + str(root / "test_reg_leaf"),
+                "    " + str(root / "test_reg_b"),
+            ],
+        )
+
+        # A scan forgets removed environments and picks up unregistered ones,
+        # but keeps registered ones it does not reach, e.g. behind a symlink
+        self.run_huv(["venv", "test_reg_hidden/env"])
+        shutil.move(self.test_dir / "test_reg_hidden", self.test_dir / ".real_hidden")
+        (self.test_dir / "test_reg_hidden").symlink_to(self.test_dir / ".real_hidden")
+        shutil.rmtree(self.test_dir / "test_reg_b")
+        subprocess.run(["uv", "venv", "test_reg_plain"], capture_output=True)
+        result = self.run_huv(["scan", "."])
+        self.assertIn("Forgot 1 environment(s)", result.stdout)
+        result = self.run_huv(["registry", "tree"])
+        self.assertIn(str(root / "test_reg_hidden" / "env"), result.stdout.splitlines())
+        result = self.run_huv(["registry", "children", "test_reg_root"])
+        self.assertEqual(result.stdout.splitlines(), [str(root / "test_reg_a")])
+        result = self.run_huv(["registry", "tree"])
+        self.assertIn(str(root / "test_reg_plain"), result.stdout.splitlines())
+
+    def test_hierarchy_command(self):
+        """Test that huv hierarchy renders the hierarchy and emits JSON"""
+        tree_path = self.test_dir / "test_tree"
+        tree_path.mkdir()
+        self.run_huv(["venv", str(tree_path / "base")])
+        self.run_huv(
+            ["venv", str(tree_path / "svc_a"), "--parent", str(tree_path / "base")]
+        )
+        self.run_huv(
+            ["venv", str(tree_path / "svc_b"), "--parent", str(tree_path / "base")]
+        )
+        self.run_huv(
+            ["venv", str(tree_path / "leaf"), "--parent", str(tree_path / "svc_a")]
+        )
+
+        result = self.run_huv(["hierarchy", tree_path.name])
+        lines = result.stdout.splitlines()
+        self.assertTrue(lines[0].startswith("base (python "))
+        self.assertTrue(lines[1].startswith("├── svc_a ("))
+        self.assertTrue(lines[2].startswith("│   └── leaf ("))
+        self.assertTrue(lines[3].startswith("└── svc_b ("))
+        self.assertIn("4 environment(s)", result.stdout)
+
+        result = self.run_huv(["hierarchy", tree_path.name, "--json"])
+        data = json.loads(result.stdout)
+        environments = {Path(env["path"]).name: env for env in data["environments"]}
+        self.assertEqual(set(environments), {"base", "svc_a", "svc_b", "leaf"})
+        self.assertIsNone(environments["base"]["parent"])
+        self.assertEqual(Path(environments["leaf"]["parent"]).name, "svc_a")
+        self.assertEqual(environments["leaf"]["shadowed"], [])
+        self.assertGreater(environments["base"]["size"], 0)
+
+        # 'huv tree' is uv's dependency tree
+        result = self.run_huv(["tree", tree_path.name], expect_success=False)
+        self.assertIn("uv tree", result.stderr)
+
     def test_get_python_version_helper(self):
         """Test the _get_python_version helper method"""
         venv_name = "test_version_helper"
@@ -344,6 +632,412 @@ class TestHuv(unittest.TestCase):
         if version is not None:
             self.assertRegex(version, r"^\d+\.\d+$")
 
+    def test_get_max_workers_helper(self):
+        """Test HUV_MAX_WORKERS parsing and its fallback to the default"""
+        huv = load_huv_module()
+        manager = huv.HierarchicalUV()
+        default = huv.HierarchicalUV.DEFAULT_MAX_WORKERS
+        original = os.environ.get("HUV_MAX_WORKERS")
+        try:
+            os.environ.pop("HUV_MAX_WORKERS", None)
+            self.assertEqual(manager._get_max_workers(), default)
+            os.environ["HUV_MAX_WORKERS"] = "3"
+            self.assertEqual(manager._get_max_workers(), 3)
+            for value in ("abc", "0", "-2", "1.5"):
+                os.environ["HUV_MAX_WORKERS"] = value
+                with mock.patch("sys.stderr") as stderr:
+                    self.assertEqual(manager._get_max_workers(), default)
+                self.assertIn(value, str(stderr.write.call_args_list))
+        finally:
+            if original is None:
+                os.environ.pop("HUV_MAX_WORKERS", None)
+            else:
+                os.environ["HUV_MAX_WORKERS"] = original
+
+    def test_plan_install_reports_child_changes(self):
+        """Test that the install plan accounts for the child's own packages"""
+        huv = load_huv_module()
+        manager = huv.HierarchicalUV()
+
+        def node(version):
+            return {"version": version, "url": None, "via": [], "requested": True}
+
+        # The child's older copy shadows the parent's, so the parent can't
+        # satisfy the node and the child's version changes
+        with mock.patch("sys.stdout"):
+            to_install, skipped, _, changes = manager._plan_install(
+                ["six"],
+                {"six": node("1.16.0")},
+                {"six": "1.16.0"},
+                installed={"six": "1.15.0"},
+            )
+        self.assertEqual(to_install, ["six==1.16.0"])
+        self.assertEqual(skipped, [])
+        self.assertEqual(changes, ["six: child v1.15.0 -> 1.16.0"])
+
+        with mock.patch("sys.stdout"):
+            to_install, _, _, changes = manager._plan_install(
+                ["idna==3.7"],
+                {"idna": node("3.7")},
+                {},
+                no_deps=True,
+                installed={"idna": "3.6", "six": "1.16.0"},
+            )
+        self.assertEqual(to_install, ["idna==3.7"])
+        self.assertEqual(changes, ["idna: child v3.6 -> 3.7"])
+
+
+class TestVersionSpecifiers(unittest.TestCase):
+    """Tests for the built-in PEP 440 version and specifier evaluation"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.huv = load_huv_module()
+
+    def test_numeric_ordering(self):
+        """Test that release segments compare numerically, not as strings"""
+        self.assertTrue(self.huv._version_satisfies("1.10", ">=1.9"))
+        self.assertFalse(self.huv._version_satisfies("1.9", ">=1.10"))
+        self.assertTrue(self.huv._version_satisfies("1.0.0", "==1.0"))
+
+    def test_specifier_sets(self):
+        """Test comma-separated clauses, exclusions and compatible releases"""
+        self.assertTrue(self.huv._version_satisfies("1.5", ">=1.0,!=1.4,<2"))
+        self.assertFalse(self.huv._version_satisfies("1.4", ">=1.0,!=1.4,<2"))
+        self.assertTrue(self.huv._version_satisfies("1.4.5", "~=1.4.2"))
+        self.assertFalse(self.huv._version_satisfies("1.5.0", "~=1.4.2"))
+        self.assertTrue(self.huv._version_satisfies("2.3.1", "==2.3.*"))
+        self.assertFalse(self.huv._version_satisfies("2.4", "==2.3.*"))
+
+    def test_pre_post_and_local_versions(self):
+        """Test ordering of pre-, post-, dev-releases and local labels"""
+        self.assertFalse(self.huv._version_satisfies("2.0rc1", "<2.0"))
+        self.assertTrue(self.huv._version_satisfies("2.0rc1", "<2.0rc2"))
+        self.assertFalse(self.huv._version_satisfies("2.0.post1", ">2.0"))
+        self.assertTrue(self.huv._version_satisfies("2.0+cpu", "==2.0"))
+        self.assertFalse(self.huv._version_satisfies("2.0+cpu", "==2.0+cu121"))
+        self.assertTrue(self.huv._version_satisfies("1.0.dev1", "<1.0a1"))
+
+    def test_invalid_input_is_incompatible(self):
+        """Test that unparseable versions and specifiers never match"""
+        self.assertFalse(self.huv._version_satisfies("not-a-version", ">=1.0"))
+        self.assertFalse(self.huv._version_satisfies("1.0", "=>1.0"))
+
+
+class TestEnvironmentMarkers(unittest.TestCase):
+    """Tests for in-process PEP 508 marker evaluation"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.huv = load_huv_module()
+        cls.environment = {
+            "python_version": "3.11",
+            "python_full_version": "3.11.7",
+            "sys_platform": "linux",
+            "platform_system": "Linux",
+            "os_name": "posix",
+            "implementation_name": "cpython",
+        }
+
+    def evaluate(self, marker):
+        return self.huv._evaluate_marker(marker, self.environment)
+
+    def test_comparisons_and_boolean_operators(self):
+        """Test version and string comparisons combined with and/or/parentheses"""
+        self.assertTrue(self.evaluate('python_version < "3.12"'))
+        self.assertFalse(self.evaluate('python_full_version >= "3.11.8"'))
+        self.assertTrue(self.evaluate('python_version == "3.*"'))
+        self.assertTrue(self.evaluate('"3.9" < python_version'))
+        self.assertTrue(
+            self.evaluate(
+                '(sys_platform == "win32" or platform_system == "Linux") '
+                'and implementation_name == "cpython"'
+            )
+        )
+        self.assertFalse(self.evaluate('os_name == "nt" and python_version > "3"'))
+        self.assertTrue(self.evaluate('"linux" in sys_platform'))
+
+    def test_undecidable_markers(self):
+        """Test that unknown variables and malformed markers are left undecided"""
+        self.assertIsNone(self.evaluate('extra == "test"'))
+        self.assertTrue(self.evaluate('extra == "test" or python_version > "3"'))
+        self.assertFalse(self.evaluate('extra == "test" and python_version < "3"'))
+        self.assertIsNone(self.evaluate("python_version <"))
+        self.assertIsNone(self.evaluate('(python_version < "3.12"'))
+
+
+class TestRequirementsFiles(unittest.TestCase):
+    """Tests for requirements file parsing"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.huv = load_huv_module()
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp(prefix="huv_requirements_"))
+        self.manager = self.huv.HierarchicalUV()
+        self.environment = {"python_version": "3.11", "python_full_version": "3.11.7"}
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_includes_constraints_and_options(self):
+        """Test that nested includes are followed once and options become flags"""
+        (self.test_dir / "sub").mkdir()
+        (self.test_dir / "requirements.txt").write_text(
+            "-r sub/base.txt\n"
+            "-c sub/constraints.txt\n"
+            "--extra-index-url https://example.invalid/simple\n"
+            "--pre\n"
+            "-e ./local-package\n"
+        )
+        (self.test_dir / "sub" / "base.txt").write_text(
+            "-r ../requirements.txt\nrequests>=2  # HTTP client\n"
+        )
+
+        requirements = self.manager._read_requirements_files(
+            [str(self.test_dir / "requirements.txt")], self.environment
+        )
+        self.assertEqual(requirements["packages"], ["requests>=2"])
+        self.assertEqual(requirements["editables"], ["./local-package"])
+        self.assertEqual(
+            requirements["flags"],
+            [
+                "-c",
+                str((self.test_dir / "sub" / "constraints.txt").resolve()),
+                "--extra-index-url",
+                "https://example.invalid/simple",
+                "--prerelease",
+                "allow",
+            ],
+        )
+
+    def test_hashes_continuations_and_markers(self):
+        """Test that hashes are kept for uv and markers are evaluated for the target"""
+        (self.test_dir / "requirements.txt").write_text(
+            "six==1.16.0 \\\n"
+            "    --hash=sha256:0000 \\\n"
+            "    --hash=sha256:1111\n"
+            'idna>=3 ; python_version >= "3.8"\n'
+            'tomli ; python_version < "3.11"\n'
+            'pywin32 ; sys_platform == "win32"\n'
+        )
+
+        requirements = self.manager._read_requirements_files(
+            [str(self.test_dir / "requirements.txt")], self.environment
+        )
+        self.assertEqual(
+            requirements["packages"],
+            ["six==1.16.0", "idna>=3", 'pywin32 ; sys_platform == "win32"'],
+        )
+        self.assertEqual(
+            requirements["hashes"], {"six": ["sha256:0000", "sha256:1111"]}
+        )
+        self.assertEqual(requirements["flags"], ["--require-hashes"])
+
+        with self.assertRaises(ValueError):
+            with self.manager._hash_checked_args(
+                ["six==1.16.0", "idna==3.7"],
+                requirements["flags"],
+                requirements["hashes"],
+            ):
+                pass
+        with self.manager._hash_checked_args(
+            ["six==1.16.0"], requirements["flags"], requirements["hashes"]
+        ) as install_args:
+            self.assertEqual(install_args[0], "-r")
+            self.assertEqual(
+                Path(install_args[1]).read_text(),
+                "six==1.16.0 --hash=sha256:0000 --hash=sha256:1111\n",
+            )
+        self.assertFalse(Path(install_args[1]).exists())
+
+    def test_missing_include(self):
+        """Test that a missing nested file is reported"""
+        (self.test_dir / "requirements.txt").write_text("-r missing.txt\n")
+        with self.assertRaises(ValueError):
+            self.manager._read_requirements_files(
+                [str(self.test_dir / "requirements.txt")], self.environment
+            )
+
+
+class TestResolutionCache(unittest.TestCase):
+    """Tests for the persistent resolution cache and its keys"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.huv = load_huv_module()
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp(prefix="huv_resolution_"))
+        self.original_environ = dict(os.environ)
+        os.environ["HUV_CACHE_DIR"] = str(self.test_dir / "cache")
+        os.environ["HUV_NO_DAEMON"] = "1"
+        os.environ["HUV_RESOLUTION_CACHE_TTL"] = "60"
+        os.environ["HUV_RESOLUTION_CACHE_SIZE"] = "2"
+        self.cache = self.huv.ResolutionCache(self.test_dir / "resolutions.json")
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.original_environ)
+        shutil.rmtree(self.test_dir)
+
+    def at(self, now):
+        """Patch the clock seen by the cache"""
+        return mock.patch.object(self.huv.time, "time", return_value=now)
+
+    def test_entries_expire_after_ttl(self):
+        """Test that an entry is served within the TTL and dropped after it"""
+        with self.at(1000.0):
+            self.cache.put("key", {"a": 1})
+        with self.at(1059.0):
+            self.assertEqual(self.cache.get("key"), {"a": 1})
+        with self.at(1060.0):
+            self.assertIsNone(self.cache.get("key"))
+
+    def test_ttl_zero_disables_cache(self):
+        """Test that HUV_RESOLUTION_CACHE_TTL=0 turns the cache off"""
+        os.environ["HUV_RESOLUTION_CACHE_TTL"] = "0"
+        cache = self.huv.ResolutionCache(self.test_dir / "disabled.json")
+        cache.put("key", 1)
+        self.assertIsNone(cache.get("key"))
+        self.assertFalse((self.test_dir / "disabled.json").exists())
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the size limit evicts the least recently used entry first"""
+        with self.at(1000.0):
+            self.cache.put("a", 1)
+        with self.at(1001.0):
+            self.cache.put("b", 2)
+        with self.at(1002.0):
+            self.assertEqual(self.cache.get("a"), 1)
+        with self.at(1003.0):
+            self.cache.put("c", 3)
+            self.assertEqual(self.cache.get("a"), 1)
+            self.assertIsNone(self.cache.get("b"))
+            self.assertEqual(self.cache.get("c"), 3)
+
+    def test_hits_batch_last_used_writes(self):
+        """Test that cache hits only rewrite the file once last_used is stale"""
+        os.environ["HUV_RESOLUTION_CACHE_TTL"] = "3600"
+        cache = self.huv.ResolutionCache(self.test_dir / "touched.json")
+        with self.at(1000.0):
+            cache.put("key", 1)
+        with mock.patch.object(
+            self.huv, "_write_json_file", wraps=self.huv._write_json_file
+        ) as write:
+            with self.at(1010.0):
+                self.assertEqual(cache.get("key"), 1)
+                self.assertEqual(cache.get("key"), 1)
+            write.assert_not_called()
+            with self.at(1000.0 + cache.TOUCH_INTERVAL):
+                self.assertEqual(cache.get("key"), 1)
+            write.assert_called_once()
+
+    def test_constraint_spellings_are_keyed_by_content(self):
+        """Test that every spelling of a constraint file is keyed by its content"""
+        constraints = self.test_dir / "constraints.txt"
+        constraints.write_text("idna<3.8\n")
+        manager = self.huv.HierarchicalUV()
+
+        def keys():
+            return {
+                manager._get_resolution_cache_key(["requests"], args)
+                for args in (
+                    ["-c", str(constraints)],
+                    ["--constraint", str(constraints)],
+                    ["--constraints", str(constraints)],
+                    [f"-c={constraints}"],
+                    [f"--constraint={constraints}"],
+                    [f"--constraints={constraints}"],
+                )
+            }
+
+        before = keys()
+        self.assertEqual(len(before), 1)
+        constraints.write_text("idna<3.7\n")
+        after = keys()
+        self.assertEqual(len(after), 1)
+        self.assertNotEqual(after, before)
+
+    def test_key_changes_with_ancestor_inventory(self):
+        """Test that installing into a parent changes the child's cache key"""
+        parent = self.test_dir / "parent"
+        child = self.test_dir / "child"
+        for venv in (parent, child):
+            (venv / "lib" / "python3.11" / "site-packages").mkdir(parents=True)
+        (parent / "pyvenv.cfg").write_text("version_info = 3.11.7\n")
+        (child / "pyvenv.cfg").write_text(
+            f"version_info = 3.11.7\nhuv_parent = {parent}\n"
+        )
+        manager = self.huv.HierarchicalUV()
+
+        def key():
+            return manager._get_resolution_cache_key(
+                ["requests>=2"], [], manager._get_parent_packages(child), child
+            )
+
+        before = key()
+        self.assertEqual(key(), before)
+        dist_info = (
+            parent / "lib" / "python3.11" / "site-packages" / "idna-3.7.dist-info"
+        )
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text("Name: idna\nVersion: 3.7\n")
+        self.assertNotEqual(key(), before)
+
+
+class TestHuvDaemon(unittest.TestCase):
+    """Tests for the daemon's in-memory state"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.huv = load_huv_module()
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp(prefix="huv_daemon_"))
+        self.original_environ = dict(os.environ)
+        os.environ["HUV_CACHE_DIR"] = str(self.test_dir)
+        os.environ["HUV_NO_DAEMON"] = "1"
+        os.environ["HUV_RESOLUTION_CACHE_SIZE"] = "2"
+        os.environ["HUV_RESOLUTION_CACHE_TTL"] = "60"
+        self.daemon = self.huv.HuvDaemon(socket_path=self.test_dir / "test.sock")
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.original_environ)
+        shutil.rmtree(self.test_dir)
+
+    def test_resolutions_are_lru_bounded(self):
+        """Test that the resolution mirror keeps only the most recently used entries"""
+        for key in ("a", "b"):
+            self.daemon._put_resolution(key, key.upper())
+        self.daemon._get_resolution("a")
+        self.daemon._put_resolution("c", "C")
+        self.assertEqual(list(self.daemon._resolutions), ["a", "c"])
+
+    def test_expired_resolution_is_dropped(self):
+        """Test that an expired memory entry is evicted instead of served"""
+        self.daemon._resolutions["stale"] = (time.time() - 120, "old")
+        self.assertEqual(self.daemon._get_resolution("stale"), {"value": None})
+        self.assertNotIn("stale", self.daemon._resolutions)
+
+    def test_disk_hit_keeps_creation_time(self):
+        """Test that a resolution loaded from disk keeps its original timestamp"""
+        created = time.time() - 30
+        (self.test_dir / "resolutions.json").write_text(
+            json.dumps(
+                {
+                    "format": 1,
+                    "entries": {
+                        "key": {"created": created, "last_used": created, "value": 1}
+                    },
+                }
+            )
+        )
+        self.assertEqual(self.daemon._get_resolution("key"), {"value": 1})
+        self.assertEqual(self.daemon._resolutions["key"], (created, 1))
+
 
 class TestHuvIntegration(unittest.TestCase):
     """Integration tests that require uv to be installed"""
@@ -368,9 +1062,22 @@ class TestHuvIntegration(unittest.TestCase):
 
         self.huv_path = Path(self.original_cwd) / "huv"
 
+        self.original_cache_dir = os.environ.get("HUV_CACHE_DIR")
+        self.original_data_dir = os.environ.get("HUV_DATA_DIR")
+        os.environ["HUV_CACHE_DIR"] = str(self.test_dir / ".huv-cache")
+        os.environ["HUV_DATA_DIR"] = str(self.test_dir / ".huv-data")
+
     def tearDown(self):
         """Clean up integration test environment"""
         if hasattr(self, "test_dir"):
+            for name, value in (
+                ("HUV_CACHE_DIR", self.original_cache_dir),
+                ("HUV_DATA_DIR", self.original_data_dir),
+            ):
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
             os.chdir(self.original_cwd)
             if self.test_dir.exists():
                 shutil.rmtree(self.test_dir)
@@ -503,6 +1210,467 @@ class TestHuvIntegration(unittest.TestCase):
             expected_path = str(parent_path.resolve())
             self.assertIn(expected_path, cfg_content)
 
+    def test_inventory_index_refreshed_by_install(self):
+        """Test that huv pip install/uninstall keep the inventory index current"""
+        venv_name = "test_inventory_index"
+        self.run_huv(["venv", venv_name])
+        venv_path = self.test_dir / venv_name
+        index_path = venv_path / ".huv" / "inventory.json"
+
+        env = {**os.environ, "VIRTUAL_ENV": str(venv_path)}
+        huv_cmd = [sys.executable, str(self.huv_path)]
+        install_result = subprocess.run(
+            huv_cmd + ["pip", "install", "six"],
+            env=env,
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+        )
+        if install_result.returncode != 0:
+            self.skipTest(f"Could not install test package: {install_result.stderr}")
+
+        with open(index_path) as f:
+            self.assertIn("six", json.load(f)["packages"])
+
+        subprocess.run(
+            huv_cmd + ["pip", "uninstall", "six"],
+            env=env,
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+            check=True,
+        )
+        with open(index_path) as f:
+            self.assertNotIn("six", json.load(f)["packages"])
+
+    def test_install_plan_respects_parent_versions(self):
+        """Test that only parent versions satisfying the requirement are skipped"""
+        parent_path = self.test_dir / "test_plan_parent"
+        child_path = self.test_dir / "test_plan_child"
+        self.run_huv(["venv", parent_path.name])
+
+        install_result = subprocess.run(
+            ["uv", "pip", "install", "six==1.16.0"],
+            env={**os.environ, "VIRTUAL_ENV": str(parent_path)},
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+        )
+        if install_result.returncode != 0:
+            self.skipTest(f"Could not install test package: {install_result.stderr}")
+
+        self.run_huv(["venv", child_path.name, "--parent", parent_path.name])
+        env = {**os.environ, "VIRTUAL_ENV": str(child_path)}
+        huv_cmd = [sys.executable, str(self.huv_path), "pip", "install"]
+
+        result = subprocess.run(
+            huv_cmd + ["six>=1.10,<2"], env=env, capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Skipping 'six'", result.stdout)
+
+        result = subprocess.run(
+            huv_cmd + ["six>1.16"], env=env, capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Parent has 'six' v1.16.0", result.stdout)
+        self.assertTrue(
+            list(get_virtualenv_py(child_path).parent.glob("six-*.dist-info"))
+        )
+
+    def test_pip_sync_installs_only_delta(self):
+        """Test that pip sync leaves ancestor packages alone and removes extras"""
+        parent_path = self.test_dir / "test_sync_parent"
+        child_path = self.test_dir / "test_sync_child"
+        self.run_huv(["venv", parent_path.name])
+
+        install_result = subprocess.run(
+            ["uv", "pip", "install", "six==1.16.0"],
+            env={**os.environ, "VIRTUAL_ENV": str(parent_path)},
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+        )
+        if install_result.returncode != 0:
+            self.skipTest(f"Could not install test package: {install_result.stderr}")
+
+        self.run_huv(["venv", child_path.name, "--parent", parent_path.name])
+        env = {**os.environ, "VIRTUAL_ENV": str(child_path)}
+        subprocess.run(
+            ["uv", "pip", "install", "six==1.16.0"],
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+
+        requirements = self.test_dir / "requirements.txt"
+        requirements.write_text("six==1.16.0\nidna==3.7\n")
+        sync_cmd = [
+            sys.executable,
+            str(self.huv_path),
+            "pip",
+            "sync",
+            "requirements.txt",
+        ]
+
+        result = subprocess.run(sync_cmd, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("1 to install, 1 to remove, 1 provided by parent", result.stdout)
+
+        site_packages = get_virtualenv_py(child_path).parent
+        self.assertTrue(list(site_packages.glob("idna-3.7.dist-info")))
+        self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+
+        result = subprocess.run(sync_cmd, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("already in sync", result.stdout)
+
+    def test_pip_sync_verifies_hashes(self):
+        """Test that pip sync of a hash-pinned file verifies or refuses it"""
+        child_path = self.test_dir / "test_hashed_child"
+        self.run_huv(["venv", child_path.name])
+        env = {**os.environ, "VIRTUAL_ENV": str(child_path)}
+        sync_cmd = [sys.executable, str(self.huv_path), "pip", "sync", "hashed.txt"]
+        site_packages = get_virtualenv_py(child_path).parent
+        requirements = self.test_dir / "hashed.txt"
+
+        # A requirement without a hash is refused before anything is installed
+        requirements.write_text(
+            "six==1.16.0 --hash=sha256:"
+            "8abb2f1d86890a2dfb989f9a77cfcfd3e47c2a354b01111771326f8aa26e0254\n"
+            "idna==3.7\n"
+        )
+        result = subprocess.run(sync_cmd, env=env, capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("requires a --hash for 'idna==3.7'", result.stderr)
+        self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+
+        # A wrong hash fails verification in uv
+        requirements.write_text("six==1.16.0 --hash=sha256:" + "0" * 64 + "\n")
+        result = subprocess.run(sync_cmd, env=env, capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Hash mismatch", result.stderr)
+        self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+
+        requirements.write_text(
+            "six==1.16.0 \\\n"
+            "    --hash=sha256:"
+            "8abb2f1d86890a2dfb989f9a77cfcfd3e47c2a354b01111771326f8aa26e0254 \\\n"
+            "    --hash=sha256:"
+            "1e61c37477a1626458e36f7b1d82aa5c9b094fa4802892072e49de9c60c4c926\n"
+        )
+        result = subprocess.run(sync_cmd, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertTrue(list(site_packages.glob("six-1.16.0.dist-info")))
+
+    def test_install_into_multiple_children(self):
+        """Test that a fan-out install shares one plan across matching children"""
+        parent_path = self.test_dir / "test_fanout_parent"
+        self.run_huv(["venv", parent_path.name])
+
+        install_result = subprocess.run(
+            ["uv", "pip", "install", "six==1.16.0"],
+            env={**os.environ, "VIRTUAL_ENV": str(parent_path)},
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+        )
+        if install_result.returncode != 0:
+            self.skipTest(f"Could not install test package: {install_result.stderr}")
+
+        children = ["test_fanout_a", "test_fanout_b", "test_fanout_c"]
+        for child in children:
+            self.run_huv(["venv", child, "--parent", parent_path.name])
+
+        # A child with packages of its own is planned separately
+        subprocess.run(
+            ["uv", "pip", "install", "idna==3.6"],
+            env={**os.environ, "VIRTUAL_ENV": str(self.test_dir / "test_fanout_c")},
+            capture_output=True,
+            check=True,
+        )
+
+        result = self.run_huv(
+            ["pip", "install", "six", "idna==3.7", "--into", "test_fanout_[abc]"]
+        )
+        self.assertIn("Analyzing dependencies for 2 target(s)", result.stdout)
+        self.assertIn("Analyzing dependencies for 1 target(s)", result.stdout)
+        self.assertIn("Installed into 3/3 environment(s)", result.stdout)
+
+        for child in children:
+            site_packages = get_virtualenv_py(self.test_dir / child).parent
+            self.assertTrue(list(site_packages.glob("idna-3.7.dist-info")))
+            self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+
+    def test_uninstall_autoremove(self):
+        """Test that autoremove drops orphaned dependencies and parent duplicates"""
+        parent_path = self.test_dir / "test_autoremove_parent"
+        child_path = self.test_dir / "test_autoremove_child"
+        self.run_huv(["venv", parent_path.name])
+        self.run_huv(["venv", child_path.name, "--parent", parent_path.name])
+
+        for venv_path, packages in (
+            (parent_path, ["idna==3.7"]),
+            (child_path, ["requests", "idna==3.7"]),
+        ):
+            install_result = subprocess.run(
+                ["uv", "pip", "install"] + packages,
+                env={**os.environ, "VIRTUAL_ENV": str(venv_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        result = subprocess.run(
+            [sys.executable, str(self.huv_path), "pip", "uninstall", "requests"]
+            + ["--autoremove"],
+            env={**os.environ, "VIRTUAL_ENV": str(child_path)},
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("idna (v3.7 identical to parent)", result.stdout)
+        self.assertIn("urllib3 (orphaned dependency)", result.stdout)
+
+        site_packages = get_virtualenv_py(child_path).parent
+        self.assertEqual(list(site_packages.glob("*.dist-info")), [])
+
+    def test_dedupe_recursive(self):
+        """Test that dedupe removes child packages identical to the parent's copy"""
+        tree_path = self.test_dir / "test_dedupe_tree"
+        tree_path.mkdir()
+        parent_path = tree_path / "parent"
+        child_path = tree_path / "child"
+        self.run_huv(["venv", str(parent_path)])
+        self.run_huv(["venv", str(child_path), "--parent", str(parent_path)])
+
+        for venv_path, packages in (
+            (parent_path, ["idna==3.7"]),
+            (child_path, ["idna==3.7", "six==1.16.0"]),
+        ):
+            install_result = subprocess.run(
+                ["uv", "pip", "install"] + packages,
+                env={**os.environ, "VIRTUAL_ENV": str(venv_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        site_packages = get_virtualenv_py(child_path).parent
+        dry_run = self.run_huv(["dedupe", tree_path.name, "--recursive", "--dry-run"])
+        self.assertIn("would remove 1 package(s)", dry_run.stdout)
+        self.assertTrue(list(site_packages.glob("idna-3.7.dist-info")))
+
+        result = self.run_huv(["dedupe", tree_path.name, "--recursive"])
+        self.assertIn("removed 1 package(s)", result.stdout)
+        self.assertIn("idna==3.7", result.stdout)
+        self.assertIn("from 1 package(s) across 1/1 environment(s)", result.stdout)
+        self.assertFalse(list(site_packages.glob("idna-*.dist-info")))
+        self.assertTrue(list(site_packages.glob("six-1.16.0.dist-info")))
+
+    def test_compact_hardlinks_sibling_files(self):
+        """Test that compact hardlinks identical files of sibling children"""
+        tree_path = self.test_dir / "test_compact_tree"
+        tree_path.mkdir()
+        parent_path = tree_path / "parent"
+        self.run_huv(["venv", str(parent_path)])
+
+        children = [tree_path / "child_a", tree_path / "child_b"]
+        for child_path in children:
+            self.run_huv(["venv", str(child_path), "--parent", str(parent_path)])
+            install_result = subprocess.run(
+                ["uv", "pip", "install", "--link-mode", "copy", "six==1.16.0"],
+                env={**os.environ, "VIRTUAL_ENV": str(child_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        six_a, six_b = (get_virtualenv_py(path).parent / "six.py" for path in children)
+        self.assertFalse(os.path.samefile(six_a, six_b))
+
+        result = self.run_huv(["compact", tree_path.name])
+        self.assertIn("Linked", result.stdout)
+        self.assertTrue(os.path.samefile(six_a, six_b))
+        self.assertTrue((tree_path / ".huv-store").is_dir())
+
+        # A second pass finds nothing left to link
+        result = self.run_huv(["compact", tree_path.name])
+        self.assertIn("Linked 0 file(s)", result.stdout)
+
+    def test_promote_shared_child_packages(self):
+        """Test that packages shared by enough children move into the parent"""
+        parent_path = self.test_dir / "test_promote_parent"
+        self.run_huv(["venv", parent_path.name])
+
+        children = {
+            self.test_dir / "test_promote_a": ["six==1.16.0", "idna==3.7"],
+            self.test_dir / "test_promote_b": ["six==1.16.0"],
+        }
+        for child_path, packages in children.items():
+            self.run_huv(["venv", child_path.name, "--parent", parent_path.name])
+            install_result = subprocess.run(
+                ["uv", "pip", "install"] + packages,
+                env={**os.environ, "VIRTUAL_ENV": str(child_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        result = self.run_huv(["promote", parent_path.name, "--min-children", "2"])
+        self.assertIn("six==1.16.0 (in 2/2 children)", result.stdout)
+        self.assertNotIn("idna", result.stdout)
+
+        parent_site_packages = get_virtualenv_py(parent_path).parent
+        self.assertTrue(list(parent_site_packages.glob("six-1.16.0.dist-info")))
+        for child_path in children:
+            site_packages = get_virtualenv_py(child_path).parent
+            self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+        child_a_site_packages = get_virtualenv_py(
+            self.test_dir / "test_promote_a"
+        ).parent
+        self.assertTrue(list(child_a_site_packages.glob("idna-3.7.dist-info")))
+
+    def test_impact_of_parent_upgrade(self):
+        """Test that impact classifies descendants of an upgraded parent"""
+        parent_path = self.test_dir / "test_impact_parent"
+        user_path = self.test_dir / "test_impact_user"
+        pinned_path = self.test_dir / "test_impact_pinned"
+        self.run_huv(["venv", parent_path.name])
+        self.run_huv(["venv", user_path.name, "--parent", parent_path.name])
+        self.run_huv(["venv", pinned_path.name, "--parent", parent_path.name])
+        grandchild_path = self.test_dir / "test_impact_grandchild"
+        self.run_huv(["venv", grandchild_path.name, "--parent", user_path.name])
+
+        for venv_path, packages in (
+            (parent_path, ["idna==3.7"]),
+            (user_path, ["requests==2.32.3", "--no-deps"]),
+            (pinned_path, ["idna==3.10"]),
+        ):
+            install_result = subprocess.run(
+                ["uv", "pip", "install"] + packages,
+                env={**os.environ, "VIRTUAL_ENV": str(venv_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        result = self.run_huv(
+            ["impact", parent_path.name, "idna==4.0"], expect_success=False
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("idna 3.7 -> 4.0", result.stdout)
+        self.assertRegex(
+            result.stderr, r"\[INCOMPATIBLE\] .*test_impact_user: requests"
+        )
+        self.assertRegex(result.stdout, r"\[OK\] .*test_impact_pinned: own idna 3.10")
+        # The grandchild sees requests through the user environment
+        self.assertRegex(
+            result.stderr,
+            r"\[INCOMPATIBLE\] .*test_impact_grandchild: requests .*"
+            r"\(from .*test_impact_user\)",
+        )
+        self.assertIn("on 3 descendant(s)", result.stdout)
+
+        result = self.run_huv(["impact", parent_path.name, "idna==3.10"])
+        self.assertRegex(result.stdout, r"\[OK\] .*test_impact_user: unaffected")
+        self.assertRegex(result.stdout, r"\[DUPLICATE\] .*test_impact_pinned")
+        self.assertRegex(result.stdout, r"\[OK\] .*test_impact_grandchild: unaffected")
+
+    def test_lock_and_install_locked(self):
+        """Test that a locked child layer can be rebuilt on top of the same parent"""
+        parent_path = self.test_dir / "test_lock_parent"
+        child_path = self.test_dir / "test_lock_child"
+        rebuilt_path = self.test_dir / "test_lock_rebuilt"
+        self.run_huv(["venv", parent_path.name])
+        self.run_huv(["venv", child_path.name, "--parent", parent_path.name])
+        self.run_huv(["venv", rebuilt_path.name, "--parent", parent_path.name])
+
+        # A local project installed in editable mode is locked by its origin
+        project_path = self.test_dir / "huvlocal"
+        project_path.mkdir()
+        (project_path / "huvlocal.py").write_text("VALUE = 1\n")
+        (project_path / "pyproject.toml").write_text(
+            '[project]\nname = "huvlocal"\nversion = "0.1.0"\n\n'
+            "[build-system]\n"
+            'requires = ["setuptools>=61"]\n'
+            'build-backend = "setuptools.build_meta"\n'
+        )
+
+        for venv_path, packages in (
+            (parent_path, ["six==1.16.0"]),
+            (child_path, ["idna==3.7", "-e", str(project_path)]),
+            (rebuilt_path, ["six==1.16.0"]),
+        ):
+            install_result = subprocess.run(
+                ["uv", "pip", "install"] + packages,
+                env={**os.environ, "VIRTUAL_ENV": str(venv_path)},
+                capture_output=True,
+                text=True,
+                cwd=self.test_dir,
+            )
+            if install_result.returncode != 0:
+                self.skipTest(
+                    f"Could not install test package: {install_result.stderr}"
+                )
+
+        # Without --layers, 'huv lock' is uv's project lock
+        result = self.run_huv(["lock", child_path.name], expect_success=False)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("uv lock", result.stderr)
+        self.assertFalse((self.test_dir / "huv-lock.json").exists())
+
+        self.run_huv(["lock", "--layers", child_path.name])
+        with open(self.test_dir / "huv-lock.json") as f:
+            lock_data = json.load(f)
+        self.assertEqual(
+            lock_data["layers"][0]["packages"], {"huvlocal": "0.1.0", "idna": "3.7"}
+        )
+        self.assertTrue(lock_data["layers"][0]["sources"]["huvlocal"]["editable"])
+        self.assertNotIn("idna", lock_data["layers"][0]["sources"])
+        self.assertEqual(
+            lock_data["packages"]["six"], {"version": "1.16.0", "layer": 1}
+        )
+
+        result = subprocess.run(
+            [sys.executable, str(self.huv_path), "install", "--locked"],
+            env={**os.environ, "VIRTUAL_ENV": str(rebuilt_path)},
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn("drifted", result.stdout)
+        # The rebuilt child's own six is not in the locked child layer
+        self.assertIn("Removing 1 package(s) not in the lockfile: six", result.stdout)
+
+        site_packages = get_virtualenv_py(rebuilt_path).parent
+        self.assertTrue(list(site_packages.glob("idna-3.7.dist-info")))
+        self.assertFalse(list(site_packages.glob("six-*.dist-info")))
+        with open(
+            next(site_packages.glob("huvlocal-0.1.0.dist-info")) / "direct_url.json"
+        ) as f:
+            self.assertTrue(json.load(f)["dir_info"]["editable"])
+
     def test_cross_platform_package_inheritance(self):
         """Test that package inheritance works immediately without activation via _virtualenv.py approach"""
         parent_name = "test_parent_inheritance"
@@ -569,6 +1737,11 @@ if __name__ == "__main__":
 
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestHuv))
+    suite.addTests(loader.loadTestsFromTestCase(TestVersionSpecifiers))
+    suite.addTests(loader.loadTestsFromTestCase(TestEnvironmentMarkers))
+    suite.addTests(loader.loadTestsFromTestCase(TestRequirementsFiles))
+    suite.addTests(loader.loadTestsFromTestCase(TestResolutionCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestHuvDaemon))
     suite.addTests(loader.loadTestsFromTestCase(TestHuvIntegration))
 
     # Run with verbose output